@@ -1,17 +1,403 @@
-import random
+from bisect import bisect_right
+from functools import lru_cache
+import numpy as np
+from numba import njit, prange
+
+
+# Card codes: 2-10 are face values (J, Q and K count as 10) and 11 is an Ace
+CARD_VALUES = np.array([2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10, 11], dtype=np.uint8)
+# Hi-Lo count delta indexed by card code
+COUNT_DELTA = np.array([0, 0, 1, 1, 1, 1, 1, 0, 0, 0, -1, -1], dtype=np.int8)
+# Same table as plain ints for the Python code path, avoiding NumPy scalar indexing per card
+_COUNT = tuple(COUNT_DELTA.tolist())
+
+# Size of the hand buffers: a hand can hold at most 21 cards without busting, plus the busting card
+MAX_HAND_CARDS = 22
+
+# Winner codes
+WINNER_NONE = 0
+WINNER_PLAYER = 1
+WINNER_DEALER = 2
+WINNER_TIE = 3
+WINNER_BLACKJACK = 4
+# Winner names returned by BlackjackGame.new_game and BlackjackGame.step, indexed by winner code
+WINNER_NAMES = (None, 'player', 'dealer', 'tie', 'blackjack')
+# Bet size indexed by bet tier: small bet, or large bet when the true count is 2 or more
+_BET = (1, 20)
+# Reward indexed by winner code and bet tier: payout per unit of bet times the bet
+_REWARD = tuple(tuple(payout * bet for bet in _BET) for payout in (0, 1, -1, 0, 1.5))
+REWARD = np.array(_REWARD, dtype=np.float32)
+# Dealer outcomes of `dealer_outcome_distribution`: final value 17-21, blackjack and bust
+DEALER_OUTCOME_VALUES = (17, 18, 19, 20, 21, 21, 22)
+DEALER_BLACKJACK = 5
+
+
+@njit(cache=True, boundscheck=False, inline='always')
+def add_card(value, soft_aces, card):
+    """
+    Add a card to a hand, converting Aces from 11 to 1 while the hand busts.
+    The hand is soft when `soft_aces > 0`.
+
+    Returns:
+    - value (int): The hand value with Aces counted as 11 where possible.
+    - soft_aces (int): The number of Aces still counted as 11.
+    """
+    value += card
+    soft_aces += card == 11
+    while value > 21 and soft_aces > 0:
+        value -= 10
+        soft_aces -= 1
+    return value, soft_aces
+
+
+@njit(cache=True, boundscheck=False)
+def draw(deck, top, running_count):
+    """
+    Draw a card from the top of the remaining cards.
+
+    Returns:
+    - card (int): The card code drawn.
+    - top (int): The number of cards remaining after the draw.
+    - running_count (int): The updated Hi-Lo running count.
+    """
+    top -= 1
+    card = deck[top]
+    return card, top, running_count + COUNT_DELTA[card]
+
+
+@njit(cache=True, boundscheck=False)
+def get_true_count(running_count, top):
+    """
+    Compute the true count from the running count and the number of cards remaining.
+    """
+    decks_remain = round(top / 52, 1)
+    return round(running_count / decks_remain)
+
+
+@njit(cache=True, boundscheck=False)
+def dealer_draw(deck, top, running_count, value, soft_aces, d_len):
+    """
+    Dealer draws until reaching hard 17 or higher, hitting on soft 17.
+
+    Returns:
+    - top (int): The number of cards remaining.
+    - running_count (int): The updated Hi-Lo running count.
+    - value (int): The final value of the dealer's hand.
+    - d_len (int): The number of cards in the dealer's hand.
+    """
+    while value < 17 or (value == 17 and soft_aces > 0):
+        card, top, running_count = draw(deck, top, running_count)
+        value, soft_aces = add_card(value, soft_aces, card)
+        d_len += 1
+    return top, running_count, value, d_len
+
+
+@njit(cache=True, boundscheck=False)
+def settle(player_value, dealer_value, d_len):
+    """
+    Compare the final hand values and return the winner code.
+    """
+    # Check bust of player, then bust of dealer
+    if player_value > 21:
+        return WINNER_DEALER
+    if dealer_value > 21:
+        return WINNER_PLAYER
+
+    # Compare two hand values if no one busts
+    if player_value > dealer_value:
+        return WINNER_PLAYER
+    if player_value < dealer_value:
+        return WINNER_DEALER
+    # If both have the same value, dealer wins with a blackjack
+    if dealer_value == 21 and d_len == 2:
+        return WINNER_DEALER
+    return WINNER_TIE
+
+
+@njit(cache=True, boundscheck=False)
+def play_episode(deck, top, running_count, policy_table, dealer_cdf):
+    """
+    Play one game from the current shoe following a fixed policy, entirely in compiled code.
+    Follows the same rules as `BlackjackGame.new_game` and `BlackjackGame.step`.
+
+    Args:
+    - deck (np.ndarray): uint8 card codes of the shoe, drawn from index `top - 1` downwards.
+    - top (int): The number of cards remaining in the shoe.
+    - running_count (int): The Hi-Lo running count of the shoe.
+    - policy_table (np.ndarray): Action (0 for stand, 1 for hit) indexed by dealer card - 2,
+      player hand value - 4, true count clipped to [-6, 6] + 6 and usable Aces.
+    - dealer_cdf (np.ndarray): Cumulative `dealer_outcome_distribution` to sample the dealer's outcome from,
+      as `BlackjackGame.sample_dealer_outcome` does, or an empty array for the dealer to draw from the shoe.
+
+    Returns:
+    - reward (float): The reward of the game.
+    - winner (int): The winner code of the game.
+    - top (int): The number of cards remaining after the game.
+    - running_count (int): The running count after the game.
+    """
+    # Place bet based on the true count
+    bet_tier = 1 if get_true_count(running_count, top) >= 2 else 0
+
+    # Deal two faced-up cards to player and one faced-up card to dealer alternatively,
+    # accumulating hand values as the cards are drawn
+    card, top, running_count = draw(deck, top, running_count)
+    player_value, player_aces = add_card(0, 0, card)
+    dealer_card, top, running_count = draw(deck, top, running_count)
+    dealer_value, dealer_aces = add_card(0, 0, dealer_card)
+    card, top, running_count = draw(deck, top, running_count)
+    player_value, player_aces = add_card(player_value, player_aces, card)
+
+    # Check blackjack
+    if player_value == 21:
+        winner = WINNER_BLACKJACK
+        if dealer_card >= 10:
+            # If dealer has a chance to get blackjack, draw a card
+            card, top, running_count = draw(deck, top, running_count)
+            if add_card(dealer_value, dealer_aces, card)[0] == 21:
+                winner = WINNER_TIE
+        return REWARD[winner, bet_tier], winner, top, running_count
+
+    while True:
+        true_count = min(max(get_true_count(running_count, top), -6), 6)
+        action = policy_table[dealer_card - 2, player_value - 4, true_count + 6, 1 if player_aces > 0 else 0]
+        if action == 0:
+            break
+        # Player hits
+        card, top, running_count = draw(deck, top, running_count)
+        player_value, player_aces = add_card(player_value, player_aces, card)
+        if player_value > 21:
+            return REWARD[WINNER_DEALER, bet_tier], WINNER_DEALER, top, running_count
+        if player_value == 21:
+            break
+
+    # Dealer plays, or the dealer's outcome is sampled without drawing from the shoe, and the hands are compared
+    if dealer_cdf.shape[0] == 0:
+        top, running_count, dealer_value, d_len = dealer_draw(deck, top, running_count, dealer_value, dealer_aces, 1)
+    else:
+        true_count = min(max(get_true_count(running_count, top), -6), 6)
+        outcome = np.searchsorted(dealer_cdf[dealer_card - 2, true_count + 6], np.random.random(), side='right')
+        # Guard against the cumulative probability rounding below 1
+        outcome = min(outcome, len(DEALER_OUTCOME_VALUES) - 1)
+        dealer_value = DEALER_OUTCOME_VALUES[outcome]
+        d_len = 2 if outcome == DEALER_BLACKJACK else 3
+    winner = settle(player_value, dealer_value, d_len)
+    return REWARD[winner, bet_tier], winner, top, running_count
+
+
+@njit(cache=True, boundscheck=False)
+def true_count_shoe(deck, true_count):
+    """
+    Rearrange a shuffled shoe in place so that the cards dealt give the Hi-Lo true count,
+    as `Cards.simulate_true_count` does: the cards remaining are deck[:top] and the cards dealt deck[top:].
+
+    Args:
+    - deck (np.ndarray): The shuffled uint8 card codes of the full shoe.
+    - true_count (int): The desired true count.
+
+    Returns:
+    - top (int): The number of cards remaining.
+    - running_count (int): The Hi-Lo running count of the cards dealt.
+
+    Raises:
+    - ValueError: If the running count cannot be reached with the cards in the shoe.
+    """
+    # Split the shuffled cards into low cards, neutral cards and high cards, each keeping the shuffled order
+    count_delta = COUNT_DELTA[deck]
+    low_cards = deck[count_delta == 1]
+    neutral_cards = deck[count_delta == 0]
+    high_cards = deck[count_delta == -1]
+
+    # Randomly choose number of decks remain between 2 to 5 inclusive, keeping to the decks remaining
+    # whose running count fits in the cards dealt and in the low (or high) cards of the shoe
+    max_decks_remain = min(5, deck.size // (abs(true_count) + 52), low_cards.size // max(abs(true_count), 1))
+    if max_decks_remain < 2:
+        raise ValueError("Cannot simulate the true count with the cards in the shoe")
+    deck_remain = np.random.randint(2, max_decks_remain + 1)
+    num_cards_dealt = (deck.size // 52 - deck_remain) * 52
+    running_count = true_count * deck_remain
+
+    if true_count >= 0:
+        counted_cards, other_cards = low_cards, high_cards
+    else:
+        counted_cards, other_cards = high_cards, low_cards
+    num_counted = abs(running_count)
+
+    # Deal the remaining cards as pairs of 1 low and 1 high card plus neutral cards so that count doesn't change
+    remaining_to_deal = num_cards_dealt - num_counted
+    min_pairs = max(0, -(-(remaining_to_deal - neutral_cards.size) // 2))
+    max_pairs = min(remaining_to_deal // 2, counted_cards.size - num_counted, other_cards.size)
+    if num_counted > min(counted_cards.size, num_cards_dealt) or min_pairs > max_pairs:
+        raise ValueError("Cannot simulate the true count with the cards in the shoe")
+
+    # Draw the number of neutral cards as if the remaining cards were dealt at random from the rest of the shoe,
+    # then round to a whole number of pairs within the range that fits the available cards
+    num_neutral = np.random.hypergeometric(
+        neutral_cards.size, deck.size - neutral_cards.size - num_counted, remaining_to_deal
+    )
+    num_pairs = min(max((remaining_to_deal - num_neutral) // 2, min_pairs), max_pairs)
+    num_neutral = remaining_to_deal - 2 * num_pairs
+
+    # Write the dealt cards to the end of the shoe and the cards remaining to the front
+    top = deck.size - num_cards_dealt
+    dealt_write, remain_write = top, 0
+    for pool, num_of_cards in (
+        (counted_cards, num_counted + num_pairs), (other_cards, num_pairs), (neutral_cards, num_neutral)
+    ):
+        deck[dealt_write:dealt_write + num_of_cards] = pool[:num_of_cards]
+        dealt_write += num_of_cards
+        deck[remain_write:remain_write + pool.size - num_of_cards] = pool[num_of_cards:]
+        remain_write += pool.size - num_of_cards
+    # Shuffle the cards remaining in place
+    np.random.shuffle(deck[:top])
+    return top, running_count
+
+
+@njit(cache=True, boundscheck=False, parallel=True)
+def simulate_batch(n_episodes, policy_table, dealer_cdf, num_of_decks=6, seed=0, chunk_size=1024, true_count=0):
+    """
+    Simulate independent games in parallel, each from a freshly shuffled shoe.
+    Games are split into chunks that reuse one shoe buffer and are seeded from `seed`
+    and the chunk index, so results do not depend on the number of threads.
+
+    Args:
+    - n_episodes (int): The number of games to simulate.
+    - policy_table (np.ndarray): Action table as described in `play_episode`.
+    - dealer_cdf (np.ndarray): Dealer outcome table as described in `play_episode`.
+    - num_of_decks (int): The number of decks in each shoe.
+    - seed (int): Base seed of the random number generators.
+    - chunk_size (int): The number of games played by each chunk.
+    - true_count (int): If non-zero, each shoe is first dealt down to this true count with `true_count_shoe`.
+
+    Returns:
+    - rewards (np.ndarray): float32 reward of each game.
+    - winners (np.ndarray): int8 winner code of each game.
+    """
+    rewards = np.empty(n_episodes, dtype=np.float32)
+    winners = np.empty(n_episodes, dtype=np.int8)
+    template = np.empty(52 * num_of_decks, dtype=np.uint8)
+    for i in range(template.size):
+        template[i] = CARD_VALUES[i % 13]
+
+    n_chunks = (n_episodes + chunk_size - 1) // chunk_size
+    for chunk in prange(n_chunks):
+        # The legacy NumPy generator is thread-local inside Numba
+        np.random.seed(seed + chunk)
+        deck = np.empty(template.size, dtype=np.uint8)
+        for i in range(chunk * chunk_size, min((chunk + 1) * chunk_size, n_episodes)):
+            deck[:] = template
+            np.random.shuffle(deck)
+            top, running_count = deck.size, 0
+            if true_count != 0:
+                top, running_count = true_count_shoe(deck, true_count)
+            reward, winner, _, _ = play_episode(deck, top, running_count, policy_table, dealer_cdf)
+            rewards[i] = reward
+            winners[i] = winner
+    return rewards, winners
+
+
+# Compile the serial kernels once at import time. The parallel simulate_batch is compiled on its first call,
+# so that importing the environment doesn't start Numba's threading layer, which is unsafe to fork
+_deck = np.tile(CARD_VALUES, 4 * 6)
+play_episode(_deck, _deck.size, 0, np.zeros((10, 17, 13, 2), dtype=np.int8), np.empty((0, 13, 7)))
+true_count_shoe(_deck, 1)
+del _deck
+
+
+@lru_cache(maxsize=None)
+def dealer_outcome_distribution():
+    """
+    Compute the probability of each dealer outcome by dealer card and true count, assuming an
+    infinite shoe whose Hi-Lo composition matches the true count: each low card rank is weighted
+    4 - true_count / 10 and each high card rank 4 + true_count / 10 per deck.
+    Computed exactly by recursion over the dealer's hand once per process.
+
+    Returns:
+    - np.ndarray: Probabilities of shape (10, 13, 7), indexed by dealer card - 2,
+      true count clipped to [-6, 6] + 6 and outcome (see DEALER_OUTCOME_VALUES).
+    """
+    distribution = np.zeros((10, 13, len(DEALER_OUTCOME_VALUES)))
+    for true_count_index in range(13):
+        true_count = true_count_index - 6
+        # Probability of drawing each card code 2-11
+        card_weights = np.array([4.0] * 13)
+        card_weights[0:5] -= true_count / 10
+        card_weights[8:13] += true_count / 10
+        card_probs = {int(card): 0.0 for card in CARD_VALUES}
+        for card, weight in zip(CARD_VALUES.tolist(), card_weights / 52):
+            card_probs[card] += weight
+
+        memo = {}
+        def outcome_probs(value, soft_aces, num_cards):
+            # Dealer stands on hard 17 or higher, hits on soft 17
+            if value > 21:
+                probs = np.zeros(len(DEALER_OUTCOME_VALUES))
+                probs[-1] = 1.0
+                return probs
+            if value > 17 or (value == 17 and not soft_aces):
+                probs = np.zeros(len(DEALER_OUTCOME_VALUES))
+                probs[DEALER_BLACKJACK if value == 21 and num_cards == 2 else value - 17] = 1.0
+                return probs
+
+            key = (value, soft_aces, min(num_cards, 3))
+            if key not in memo:
+                probs = np.zeros(len(DEALER_OUTCOME_VALUES))
+                for card, prob in card_probs.items():
+                    new_value, new_soft_aces = value + card, soft_aces + (card == 11)
+                    if new_value > 21 and new_soft_aces:
+                        new_value, new_soft_aces = new_value - 10, new_soft_aces - 1
+                    probs += prob * outcome_probs(new_value, new_soft_aces, num_cards + 1)
+                memo[key] = probs
+            return memo[key]
+
+        for dealer_card in range(2, 12):
+            distribution[dealer_card - 2, true_count_index] = outcome_probs(
+                dealer_card, int(dealer_card == 11), 1
+            )
+    return distribution
 
 
 class Cards:
-    def __init__(self, num_of_decks=6):
-        self.cards_remain = []
-        self.cards_dealt = []
+    # Fixed attribute layout: attribute access is a slot lookup instead of an instance dict walk
+    __slots__ = (
+        'num_of_decks', '_rng', '_template', 'deck', 'top', '_decks_remain', 'running_count', 'true_count'
+    )
+
+    def __init__(self, num_of_decks=6, seed=None):
         self.num_of_decks = num_of_decks
+        # Random number generator used for all shuffles; pass a seed for reproducible shoes
+        self._rng = np.random.default_rng(seed)
+        # Shoe buffer allocated once: cards are drawn from index top - 1 downwards,
+        # so deck[:top] are the cards remaining and deck[top:] the cards dealt
+        self._template = np.tile(CARD_VALUES, 4 * num_of_decks)
+        self.deck = np.empty(len(self._template), dtype=np.uint8)
+        self.top = 0
+        # Number of decks remaining, rounded to 1 decimal place, indexed by the number of cards remaining
+        self._decks_remain = tuple(round(top / 52, 1) for top in range(len(self.deck) + 1))
         self.running_count = 0
         self.true_count = 0
 
         self.reset()
     
 
+    def seed(self, seed=None):
+        """
+        Reseed the random number generator used for shuffling, then reshuffle the full decks.
+
+        Args:
+        - seed (int, np.random.Generator or None): Seed for the generator; None seeds from the OS.
+        """
+        self._rng = np.random.default_rng(seed)
+        self.initialize_cards()
+    
+
+    @property
+    def rng(self):
+        """
+        The random number generator used for shuffling, also used by the game for its other random draws.
+        """
+        return self._rng
+    
+
     def reset(self, true_count=0):
         """
         Reset the deck. If `true_count` is specified, simulate a specific state; 
@@ -21,13 +407,14 @@ class Cards:
         - true_count (int): The desired true count for the simulated game state.
 
         Raises:
-        - ValueError: If the recalculated true count does not match the given true_count.
+        - ValueError: If the true count cannot be simulated with the cards in the deck(s)
+          (see `simulate_true_count`), or the recalculated true count does not match the given true_count.
         """
         # If true count is not specified, create decks and shuffle them
         if true_count == 0:
             self.initialize_cards()
         else:
-            self.running_count, self.cards_remain, self.cards_dealt = self.simulate_true_count(true_count=true_count)
+            self.running_count, self.top = self.simulate_true_count(true_count=true_count)
             # Recalculate the true count
             self.update_true_count()
             # Assert that self.true_count matches the provided true_count
@@ -41,16 +428,11 @@ class Cards:
         """
         Create and shuffle the cards for the given number of decks.
         """
-        # Create 1 deck of cards
-        cards = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
-        deck = cards * 4
-        # Create decks of cards based on num_of_decks
-        decks = deck * self.num_of_decks
-        # Shuffle them
-        random.shuffle(decks)
-        
-        self.cards_remain = decks
-        self.cards_dealt = []
+        # Refill the shoe from the template and shuffle it in place
+        np.copyto(self.deck, self._template)
+        self._rng.shuffle(self.deck)
+
+        self.top = len(self.deck)
         self.running_count = 0
         self.true_count = 0
     
@@ -58,92 +440,81 @@ class Cards:
     def simulate_true_count(self, true_count):
         """
         Simulate the cards dealt and remaining cards to achieve a specific true count.
+        The cards are written directly into the deck buffer: remaining cards in deck[:top]
+        and dealt cards in deck[top:]. Between 2 and 5 decks remain, fewer for a true count above 10
+        in absolute value so that the running count fits in the cards dealt and in the low or high cards.
 
         Args:
         - true_count (int): The desired true count for the simulation.
 
         Returns:
         - running_count (int): The current Hi-Lo running count.
-        - cards_remain (list): The list of cards left in the deck(s).
-        - cards_dealt (list): The list of cards already dealt.
-        """
-        # Initialize low cards, neutral cards and high cards
-        low_cards = ['2', '3', '4', '5', '6'] * 4 * self.num_of_decks
-        neutral_cards = ['7', '8', '9'] * 4 * self.num_of_decks
-        high_cards = ['10', 'J', 'Q', 'K', 'A'] * 4 * self.num_of_decks
-        random.shuffle(low_cards)
-        random.shuffle(neutral_cards)
-        random.shuffle(high_cards)
-
-        # Randomly choose number of decks remain between 2 to 5 inclusive
-        deck_remain = random.randint(2, 5)
+        - top (int): The number of cards left in the deck(s).
+
+        Raises:
+        - ValueError: If the running count cannot be reached with the cards in the deck(s),
+          for a true count above 52 in absolute value with 6 decks.
+        """
+        # Shuffle the cards once and split them into low cards, neutral cards and high cards,
+        # each keeping the shuffled order
+        cards = self._rng.permutation(self._template)
+        count_delta = COUNT_DELTA[cards]
+        low_cards = cards[count_delta == 1]
+        neutral_cards = cards[count_delta == 0]
+        high_cards = cards[count_delta == -1]
+
+        # Randomly choose number of decks remain between 2 to 5 inclusive, keeping to the decks remaining
+        # whose running count fits in the cards dealt and in the low (or high) cards of the shoe
+        max_decks_remain = min(5, len(cards) // (abs(true_count) + 52), len(low_cards) // max(abs(true_count), 1))
+        if max_decks_remain < 2:
+            raise ValueError("Cannot simulate the true count with the cards in the shoe")
+        deck_remain = int(self._rng.integers(2, max_decks_remain + 1))
         # calculate number of cards requried to deal and running count
         num_cards_dealt = (self.num_of_decks - deck_remain) * 52    
         running_count = true_count * deck_remain  
 
-        cards_dealt = []
-        # If true count is non-negative, number of low cards required = running count
-        if true_count >= 0:
-            cards_dealt += self.deal_cards(low_cards, running_count)
-        # Else, number of high cards required = absolute value of running count
-        else:
-            cards_dealt += self.deal_cards(high_cards, abs(running_count))
-
-        # Deal remaining cards to match num_cards_dealt
-        remaining_to_deal = num_cards_dealt - abs(running_count)
-        while remaining_to_deal > 0:
-            # If all nuetral cards are dealt, then take 1 card from each of low and high cards to make sure the count doesn't change
-            if len(neutral_cards) == 0:
-                cards_dealt += self.deal_cards(low_cards, 1)
-                cards_dealt += self.deal_cards(high_cards, 1)
-                remaining_to_deal -= 2
-            # Else if all low or high cards are dealt, then take 1 card from nuetral card so that count doesn't change
-            elif min(len(low_cards), len(high_cards)) == 0:
-                cards_dealt += self.deal_cards(neutral_cards, 1)
-                remaining_to_deal -= 1
-            # Else, choose randomly from the two methods
-            else:
-                if random.random() <= 0.5:
-                    cards_dealt += self.deal_cards(neutral_cards, 1)
-                    remaining_to_deal -= 1
-                else:
-                    cards_dealt += self.deal_cards(low_cards, 1)
-                    cards_dealt += self.deal_cards(high_cards, 1)
-                    remaining_to_deal -= 2
-
-        # Get cards remaining
-        cards_remain = low_cards + neutral_cards + high_cards
-        random.shuffle(cards_remain)
+        # If true count is non-negative, number of low cards required = running count,
+        # else, number of high cards required = absolute value of running count
+        counted_cards, other_cards = (low_cards, high_cards) if true_count >= 0 else (high_cards, low_cards)
+        num_counted = abs(running_count)
+
+        # Deal the remaining cards as pairs of 1 low and 1 high card plus neutral cards so that count doesn't change
+        remaining_to_deal = num_cards_dealt - num_counted
+        min_pairs = max(0, -(-(remaining_to_deal - len(neutral_cards)) // 2))
+        max_pairs = min(remaining_to_deal // 2, len(counted_cards) - num_counted, len(other_cards))
+        if num_counted > min(len(counted_cards), num_cards_dealt) or min_pairs > max_pairs:
+            raise ValueError("Cannot simulate the true count with the cards in the shoe")
+
+        # Draw the number of neutral cards as if the remaining cards were dealt at random from the rest of the shoe,
+        # then round to a whole number of pairs within the range that fits the available cards
+        num_neutral = int(self._rng.hypergeometric(
+            len(neutral_cards), len(cards) - len(neutral_cards) - num_counted, remaining_to_deal
+        ))
+        num_pairs = min(max((remaining_to_deal - num_neutral) // 2, min_pairs), max_pairs)
+        num_neutral = remaining_to_deal - 2 * num_pairs
+
+        # Write the dealt cards to the end of the deck buffer and the cards remaining to the front.
+        # The order of the dealt cards doesn't matter as they are never drawn again
+        top = len(self.deck) - num_cards_dealt
+        dealt_write, remain_write = top, 0
+        for pool, num_of_cards in (
+            (counted_cards, num_counted + num_pairs), (other_cards, num_pairs), (neutral_cards, num_neutral)
+        ):
+            self.deck[dealt_write:dealt_write + num_of_cards] = pool[:num_of_cards]
+            dealt_write += num_of_cards
+            self.deck[remain_write:remain_write + len(pool) - num_of_cards] = pool[num_of_cards:]
+            remain_write += len(pool) - num_of_cards
+        # Shuffle the cards remaining in place
+        self._rng.shuffle(self.deck[:top])
         
-        return running_count, cards_remain, cards_dealt
-    
-
-    def deal_cards(self, card_pool, num_of_cards):
-        """
-        Helper function to deal a specified number of cards from a card pool.
-
-        Args:
-        - card_pool (list): The list of available cards to deal from.
-        - num_of_cards (int): The number of cards to deal.
-
-        Returns:
-        - List of dealt cards.
-        """
-        dealt_cards = []
-        for _ in range(num_of_cards):
-            if card_pool:
-                dealt_cards.append(card_pool.pop())
-        return dealt_cards
+        return running_count, top
 
 
     def update_running_count(self, card):
         """
         Update the running count based on the card drawn.
         """
-        if card in ['2', '3', '4', '5', '6']:
-            self.running_count += 1
-        elif card in ['10', 'J', 'Q', 'K', 'A']:
-            self.running_count -= 1
+        self.running_count += _COUNT[card]
 
     
     def update_true_count(self):
@@ -151,16 +522,16 @@ class Cards:
         Update the true count based on the running count and remaining cards.
         """
         # True count = intermediate count / the number of remaining decks
-        decks_remain = round(len(self.cards_remain) / 52, 1)
-        self.true_count = round(self.running_count / decks_remain)
+        self.true_count = round(self.running_count / self._decks_remain[self.top])
     
 
     def draw_card(self):
         """
         Draw a card from the remaining cards and update the counts.
         """   
-        # Draw a card from the end of list
-        card = self.cards_remain.pop() 
+        # Draw a card from the top of the remaining cards
+        self.top -= 1
+        card = int(self.deck[self.top])
         # Update running count and true count
         self.update_running_count(card)
         self.update_true_count()
@@ -173,10 +544,14 @@ class Hand:
     Represents a hand of cards in a game of Blackjack.
     Handles adding cards, calculating hand value, and updating aces relevant variables.
     """
+    __slots__ = ('cards', 'num_cards', 'hand_value', 'soft_aces', 'usable_aces', 'soft')
+
     def __init__(self):
-        self.hand = []
+        # Card buffer allocated once and reused across games
+        self.cards = np.empty(MAX_HAND_CARDS, dtype=np.uint8)
+        self.num_cards = 0
         self.hand_value = 0
-        self.aces_value = []
+        self.soft_aces = 0
         self.usable_aces = False
         self.soft = False
 
@@ -185,66 +560,76 @@ class Hand:
         """
         Resets the hand to its initial state: no cards, no value, and no aces.
         """
-        self.hand = []
+        self.num_cards = 0
         self.hand_value = 0
-        self.aces_value = []
+        self.soft_aces = 0
         self.usable_aces = False
         self.soft = False
     
 
     def add_card(self, card):
         """
-        Adds a card to the hand and updates the hand value accordingly.
+        Adds a card to the hand and updates the hand value incrementally,
+        adjusting for aces if the value exceeds 21 (turning aces from 11 to 1).
         
         Args:
-            card (str): The card to be added (e.g., '2', 'A', 'J').
+            card (int): The card code to be added (2-10, or 11 for an Ace).
         """
-        self.hand.append(card)
-        self.update_hand()
-    
+        self.cards[self.num_cards] = card
+        self.num_cards += 1
 
-    def update_hand(self):
-        """
-        Updates the hand value based on the cards in the hand, adjusting for aces
-        if the value exceeds 21 (turning aces from 11 to 1).
-        """
-        value = 0
-        aces_value = []
-        for card in self.hand:
-            if card in ['J', 'Q', 'K']:
-                value += 10
-            elif card == 'A':
-                # Try to value the Ace at 11
-                value += 11
-                aces_value.append(11)
-            else:
-                # For the rest of cards from 2 to 10
-                value += int(card)
+        # Accumulate the hand value with the Ace valued at 11 first
+        value = self.hand_value + card
+        soft_aces = self.soft_aces + (card == 11)
 
         # Adjust for multiple Aces if the value exceeds 21
-        while value > 21 and 11 in aces_value:
+        while value > 21 and soft_aces:
             # Convert one Ace from 11 to 1
             value -= 10
-            aces_value[aces_value.index(11)] = 1
+            soft_aces -= 1
 
         self.hand_value = value
-        self.aces_value = aces_value
-        self.usable_aces = 11 in self.aces_value and value <= 21
-        self.soft = 11 in self.aces_value
-        
-        
+        self.soft_aces = soft_aces
+        self.usable_aces = soft_aces > 0
+        self.soft = soft_aces > 0
+    
+
+    @property
+    def hand(self):
+        """
+        The cards currently in the hand, as a view of the card buffer.
+        """
+        return self.cards[:self.num_cards]
+
+
 
 class BlackjackGame:
-    def __init__(self):
+    __slots__ = (
+        'total_decks', 'min_num_of_cards', 'cards', 'dealer_hand', 'player_hand', 'state', 'actions', 'bet', 'bet_tier', 'winner',
+        'exact_dealer', '_dealer_cdf'
+    )
+
+    def __init__(self, exact_dealer=True, seed=None):
+        """
+        Args:
+        - exact_dealer (bool): If True, the dealer draws cards from the shoe. If False, the dealer's
+          final outcome is sampled from `dealer_outcome_distribution` given the dealer card and true count,
+          without drawing cards from the shoe, which leaves the counts unchanged.
+        - seed (int or None): Seed for shuffling and dealer sampling, for reproducible games.
+        """
+        self.exact_dealer = exact_dealer
+        self._dealer_cdf = None if exact_dealer else np.cumsum(dealer_outcome_distribution(), axis=-1).tolist()
+
         self.total_decks = 6
         self.min_num_of_cards = 52 * self.total_decks * 0.25
 
         # Initialize cards and hans using previous classes
-        self.cards = Cards(num_of_decks=self.total_decks)
+        self.cards = Cards(num_of_decks=self.total_decks, seed=seed)
         self.dealer_hand = Hand()
         self.player_hand = Hand()
 
-        # State: dealer first card value, player hand value, true count, usable Aces in player hand
+        # State: dealer first card value, player hand value, true count, usable Aces in player hand.
+        # Updated in place during a game; new_game and step return it frozen as a tuple
         self.state = [0, 0, 0, False]
         # Action: 0 for stand and 1 for hit
         self.actions = [0, 1]
@@ -259,20 +644,19 @@ class BlackjackGame:
 
         Args:
         - true_count (int): Desired true count for the reset (default is 0).
+
+        Raises:
+        - ValueError: If the true count cannot be simulated with the cards in the shoe (see `Cards.reset`).
         """
         self.cards.reset(true_count=true_count)
         self.dealer_hand.reset()
         self.player_hand.reset()
         self.bet = 0
-        self.winner = None
+        self.bet_tier = 0
+        self.winner = WINNER_NONE
 
-        # Reset state based on true count
-        if true_count == 0:
-            # Default state: empty hands, true count=0, no available Ace
-            self.state = [0, 0, 0, False]
-        else:
-            # State with specified true count
-            self.state = [0, 0, self.cards.true_count, False]
+        # Reset state in place: empty hands, true count of the deck (0 unless specified), no available Ace
+        self.state[:] = 0, 0, self.cards.true_count, False
 
 
     def deal_initial_hands(self):
@@ -295,6 +679,10 @@ class BlackjackGame:
         """
         Dealer's turn to play according to the rules.
         """
+        if not self.exact_dealer:
+            self.sample_dealer_outcome()
+            return
+
         hand_value = self.dealer_hand.hand_value
         soft = self.dealer_hand.soft
 
@@ -308,6 +696,30 @@ class BlackjackGame:
             soft = self.dealer_hand.soft
             soft_17 = (hand_value == 17) and soft
 
+
+    def sample_dealer_outcome(self):
+        """
+        Sample the dealer's final hand from the precomputed outcome distribution.
+        For a blackjack the dealer's hole card is added, otherwise only the hand value is set.
+        """
+        dealer_card = int(self.dealer_hand.cards[0])
+        true_count_index = min(max(self.cards.true_count, -6), 6) + 6
+        outcome = bisect_right(self._dealer_cdf[dealer_card - 2][true_count_index], self.cards.rng.random())
+        # Guard against the cumulative probability rounding below 1
+        outcome = min(outcome, len(DEALER_OUTCOME_VALUES) - 1)
+
+        if outcome == DEALER_BLACKJACK:
+            # The hole card of a blackjack is an Ace for a ten-valued card, and a ten-valued card for an Ace
+            self.dealer_hand.add_card(21 - dealer_card)
+        else:
+            # The drawn cards are unknown: record them as 0 so the hand is settled as a multi-card hand
+            self.dealer_hand.cards[self.dealer_hand.num_cards:3] = 0
+            self.dealer_hand.num_cards = 3
+            self.dealer_hand.hand_value = DEALER_OUTCOME_VALUES[outcome]
+            self.dealer_hand.soft_aces = 0
+            self.dealer_hand.usable_aces = False
+            self.dealer_hand.soft = False
+
     
     def player_hit(self):
         """
@@ -328,17 +740,17 @@ class BlackjackGame:
         player_bj = self.player_hand.hand_value == 21
 
         if player_bj:
-            if self.dealer_hand.hand[0] in ['10', 'J', 'Q', 'K', 'A']:
+            if self.dealer_hand.cards[0] >= 10:
                 # If dealer has a chance to get blackjack, draw a card
                 self.dealer_hand.add_card(self.cards.draw_card())
                 # Player wins unless dealer also has a blackjack, in which case a tie occurs
-                self.winner = 'tie' if self.dealer_hand.hand_value == 21 else 'blackjack'
+                self.winner = WINNER_TIE if self.dealer_hand.hand_value == 21 else WINNER_BLACKJACK
             else:
                 # If dealer doesn't have a chance to get blackjack, player wins
-                self.winner = 'blackjack'
+                self.winner = WINNER_BLACKJACK
         else:
             # If player doesn't have a blackjack, game continues
-            self.winner = None
+            self.winner = WINNER_NONE
             
         return player_bj
     
@@ -347,32 +759,32 @@ class BlackjackGame:
         """
         Check the result of the game.
         """
-        if len(self.player_hand.hand) == 2 and len(self.dealer_hand.hand) == 1:
+        if self.player_hand.num_cards == 2 and self.dealer_hand.num_cards == 1:
             # Check blackjack after initial cards dealt
             player_bj = self.check_blackjack()
             return self.winner
         else:
             # Check bust of player
             if self.player_hand.hand_value > 21:
-                self.winner = 'dealer'
+                self.winner = WINNER_DEALER
                 return self.winner
 
             # Check bust of dealer
             if self.dealer_hand.hand_value > 21:
-                self.winner = 'player'
+                self.winner = WINNER_PLAYER
                 return self.winner
 
             # Compare two hand values if no one busts
             if self.player_hand.hand_value > self.dealer_hand.hand_value:
-                self.winner = 'player'
+                self.winner = WINNER_PLAYER
             elif self.player_hand.hand_value < self.dealer_hand.hand_value:
-                self.winner = 'dealer'
+                self.winner = WINNER_DEALER
             else:
                 # If both dealer and player have the same value, check if dealer has blackjack
-                if self.dealer_hand.hand_value == 21 and len(self.dealer_hand.hand) == 2:
-                    self.winner = 'dealer'
+                if self.dealer_hand.hand_value == 21 and self.dealer_hand.num_cards == 2:
+                    self.winner = WINNER_DEALER
                 else:
-                    self.winner = 'tie'
+                    self.winner = WINNER_TIE
             return self.winner
     
 
@@ -380,27 +792,16 @@ class BlackjackGame:
         """
         Place a bet based on the true count
         """
-        if self.cards.true_count >= 2:
-            # Large bet
-            self.bet = 20
-        else:
-            # Small bet
-            self.bet = 1
+        # Large bet if true count is 2 or more, else small bet
+        self.bet_tier = int(self.cards.true_count >= 2)
+        self.bet = _BET[self.bet_tier]
     
 
     def clearing(self):
         """
-        Calculate the rewared based on winner.
+        Look up the reward for the winner and the bet tier.
         """
-        if self.winner == 'dealer':
-            reward = -1 * self.bet
-        elif self.winner == 'player':
-            reward = self.bet
-        elif self.winner == 'blackjack':
-            reward = 1.5 * self.bet
-        else:
-            reward = 0
-        return reward
+        return _REWARD[self.winner][self.bet_tier]
     
 
     def new_game(self):
@@ -408,16 +809,16 @@ class BlackjackGame:
         Start a new game on the same table.
         The Hi-Lo counting system continues from the last game unless shuffle cards.
         Return reward, current state and winner.
+        The state is an immutable tuple, so callers can store it (e.g. in a replay buffer) without copying.
         """
         # Shuffle cards if 75% of cards have been dealt
-        if len(self.cards.cards_remain) <= self.min_num_of_cards:
+        if self.cards.top <= self.min_num_of_cards:
             self.cards.initialize_cards()
         
-        # Reset hands, state
+        # Reset hands; the state list is refilled in place when the initial cards are dealt
         self.dealer_hand.reset()
         self.player_hand.reset()
-        self.winner = None
-        self.state = [0, 0, self.cards.true_count, False]
+        self.winner = WINNER_NONE
 
         # Place bet
         self.place_bet()
@@ -429,13 +830,14 @@ class BlackjackGame:
         self.check_winner()
         reward = self.clearing()
             
-        return reward, self.state, self.winner
+        return reward, tuple(self.state), WINNER_NAMES[self.winner]
     
 
     def step(self, action):
         """
         Player takes an action, hit or stand.
-        Return reward, next state and winner
+        Return reward, next state and winner.
+        The state is an immutable tuple, so callers can store it (e.g. in a replay buffer) without copying.
         """
         if action == 1:
             # If player choose hit
@@ -446,7 +848,7 @@ class BlackjackGame:
 
             if player_hand_value > 21:
                 # If player busts, dealer wins
-                self.winner = 'dealer'
+                self.winner = WINNER_DEALER
                 reward = self.clearing()
             elif player_hand_value == 21:
                 # If player get 21, dealer plays
@@ -456,7 +858,7 @@ class BlackjackGame:
                 reward = self.clearing()
             else:
                 # If player hand is less than 21, continue
-                self.winner = None
+                self.winner = WINNER_NONE
                 reward = 0
 
         elif action == 0:
@@ -470,9 +872,37 @@ class BlackjackGame:
             # Invalid action
             assert False, "Invalid action"
         
-        return reward, self.state, self.winner
+        return reward, tuple(self.state), WINNER_NAMES[self.winner]
     
 
+    def simulate(self, num_games, policy_table, true_count=0):
+        """
+        Play independent games with a fixed policy in compiled code, each from a freshly shuffled shoe,
+        or from a shoe dealt down to `true_count` as after `reset(true_count=true_count)`.
+        The table's games are not affected, but the seed is drawn from the shuffling generator.
+        Unless `exact_dealer`, the dealer's outcomes are sampled as in `sample_dealer_outcome`.
+
+        Args:
+        - num_games (int): The number of games to play.
+        - policy_table (np.ndarray): Action (0 for stand, 1 for hit) indexed by dealer card - 2,
+          player hand value - 4, true count clipped to [-6, 6] + 6 and usable Aces.
+        - true_count (int): True count of the shoe at the start of each game (default is 0).
+
+        Returns:
+        - rewards (np.ndarray): float32 reward of each game.
+        - winners (np.ndarray): int8 winner code of each game.
+
+        Raises:
+        - ValueError: If the true count cannot be simulated with the cards in the shoe, as in `reset`.
+        """
+        if self.exact_dealer:
+            dealer_cdf = np.empty((0, 13, len(DEALER_OUTCOME_VALUES)))
+        else:
+            dealer_cdf = np.cumsum(dealer_outcome_distribution(), axis=-1)
+        seed = int(self.cards.rng.integers(2 ** 31))
+        return simulate_batch(num_games, policy_table, dealer_cdf, self.total_decks, seed, 1024, true_count)
+
+
     def print_game_state(self):
         """
         Print the current sate of the game
@@ -481,6 +911,6 @@ class BlackjackGame:
         print(f"Player's hand is {self.player_hand.hand} and it's value is {self.player_hand.hand_value}")
         print(f"Hi-Lo count is {self.cards.running_count} and true count is {self.cards.true_count}")
         print(f"Current state is {self.state}")
-        print(f"Cards remaining {len(self.cards.cards_remain)}")
-        print(f"Winner is {self.winner}")
+        print(f"Cards remaining {self.cards.top}")
+        print(f"Winner is {WINNER_NAMES[self.winner]}")
 
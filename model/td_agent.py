@@ -1,13 +1,74 @@
-import random
 import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 import numpy as np
+from numba import njit
 from tqdm import tqdm
 import matplotlib.pyplot as plt
 import seaborn as sns
 
 
+# Maximum number of visits with an eligibility trace: one per step of an episode,
+# and a hand can't take more cards than this
+TRACE_CAPACITY = 32
+# Traces decayed below this value are dropped from the trace window
+TRACE_THRESHOLD = 1e-6
+# Number of random draws generated at once for the epsilon-greedy policy
+RANDOM_BATCH = 4096
+
+
+def _flat_index(dealer_index, player_index, true_count_index, usable_ace_index):
+    """
+    Index of the stand action of a state in the flattened Q-table; the hit action is the next index.
+    """
+    return (((dealer_index * 17 + player_index) * 13 + true_count_index) * 2 + usable_ace_index) * 2
+
+
+@njit(cache=True, fastmath=True)
+def _td_step(q, best_action, visits, visited_index, num_visited, trace_powers, index, target, alpha):
+    """
+    One TD(lambda) update: compute the TD error of the state-action pair at `index` of the flattened
+    Q-table `q`, count the visit in `visits` and record it in the ring buffer `visited_index`, then
+    update the Q-values of the visits in the trace window, keeping the greedy action of their states
+    in `best_action` up to date.
+    The eligibility trace of a visit made `age` steps ago is trace_powers[age], so a pair visited
+    several times accumulates the traces of all its visits.
+    Returns the new number of visits in the episode.
+    """
+    # Compute TD error
+    delta = target - q[index]
+
+    # Record the visit
+    visits[index] += 1
+    capacity = visited_index.size
+    visited_index[num_visited % capacity] = index
+    num_visited += 1
+
+    # Update Q-values of the visits in the trace window, newest first
+    step = alpha * delta
+    for age in range(min(num_visited, trace_powers.size)):
+        visited = visited_index[(num_visited - 1 - age) % capacity]
+        q[visited] += step * trace_powers[age]
+        state = visited // 2
+        best_action[state] = 1 if q[2 * state + 1] > q[2 * state] else 0
+    return num_visited
+
+
+def _train_worker(env_fn, seed, num_episodes, hyperparameters, on_policy, true_count):
+    """
+    Train a new agent on a new environment in a worker process of TemporalDifference.train_parallel.
+    Returns the agent's flattened Q-table and visit counts.
+    """
+    alpha, gamma, epsilon, lambd = hyperparameters
+    agent = TemporalDifference(env_fn(seed=seed), alpha, gamma, epsilon, lambd, seed=seed)
+    agent.train(num_episodes, on_policy=on_policy, true_count=true_count, verbose=False)
+    return agent.Q_flat, agent.visits
+
+
 class TemporalDifference:
-    def __init__(self, env, alpha=0.1, gamma=0.9, epsilon=0.1, lambd=0.9):
+    def __init__(self, env, alpha=0.1, gamma=0.9, epsilon=0.1, lambd=0.9, seed=None):
         self.env = env
         self.alpha = alpha
         self.max_alpha = alpha
@@ -16,14 +77,66 @@ class TemporalDifference:
         self.max_epsilon = epsilon
         self.lambd = lambd
 
-        # Set up Q-table and eligibility trace
-        self.Q = np.zeros((10, 17, 13, 2, 2))  # dealer first card, player hand value, true count index, usable Aces, action 
-        self.E = np.zeros((10, 17, 13, 2, 2))
+        # Set up Q-table
+        self.Q = np.zeros((10, 17, 13, 2, 2), dtype=np.float32)  # dealer first card, player hand value, true count index, usable Aces, action 
+        # Number of visits of each state-action pair, indexed like Q_flat: the pair at the `index` passed to
+        # _td_step, which is the one directly visited, is counted on each step
+        self.visits = np.zeros(self.Q_flat.size, dtype=np.int64)
+        # Eligibility traces are not stored: only the state-action pairs visited in the episode have a non-zero trace,
+        # given by their age. Ring buffer of the flat Q-table indices visited, and the number of visits in the episode
+        self._visited_index = np.empty(TRACE_CAPACITY, dtype=np.int32)
+        self._num_visited = 0
+
+        # Actions of the environment, fixed for the agent's lifetime
+        self._actions = np.asarray(env.actions, dtype=np.int8)
+
+        # Random numbers for the epsilon-greedy policy, drawn in batches of RANDOM_BATCH:
+        # uniform numbers to explore with and random actions, consumed from position _rand_i
+        self._rng = np.random.default_rng(seed)
+        self._rand_uniform = []
+        self._rand_action = []
+        self._rand_i = 0
+
+
+    @property
+    def Q(self):
+        """
+        Q-table indexed by dealer first card, player hand value, true count index, usable Aces and action.
+        Read-only: change the Q-values by assigning a new table.
+        """
+        return self._Q_view
+
+
+    @Q.setter
+    def Q(self, q_table):
+        # Copy a writable table, so that the caller can't change it behind the cached greedy actions.
+        # A read-only one, e.g. memory-mapped by load_q_table, is used as is until train copies it
+        q_table = np.asarray(q_table)
+        self._Q = q_table.copy() if q_table.flags.writeable else np.ascontiguousarray(q_table)
+        # Keep a flat view of the Q-table in sync, indexed by _flat_index, and the greedy action of every state,
+        # indexed by _flat_index // 2: hit only if its Q-value is strictly higher, as np.argmax breaks ties
+        # towards stand.
+        # Both are rebuilt on assignment only; train keeps the greedy actions up to date as it updates Q-values
+        self._Q_flat = self._Q.reshape(-1)
+        self._best_a = (self._Q_flat[1::2] > self._Q_flat[0::2]).astype(np.int8)
+        # Read-only views for callers, as writing to them would leave the greedy actions stale
+        self._Q_view = self._Q.view()
+        self._Q_view.flags.writeable = False
+        self._Q_flat_view = self._Q_flat.view()
+        self._Q_flat_view.flags.writeable = False
+
+
+    @property
+    def Q_flat(self):
+        """
+        Read-only flat view of the Q-table, indexed by _flat_index.
+        """
+        return self._Q_flat_view
 
 
     def map_state(self, state):
         """
-        Map a state to the corresponding indices for Q-table and eligibility trace.
+        Map a state to the corresponding indices for Q-table.
         """
         dealer_card, player_total, true_count, usable_ace = state
 
@@ -56,14 +169,35 @@ class TemporalDifference:
         """
         Epsilon-greedy policy for action selection.
         """
-        dealer_index, player_index, true_count_index, usable_ace_index = self.map_state(state)
-        if random.random() < self.epsilon:
+        return self._greedy_from_idx(_flat_index(*self.map_state(state)))
+
+
+    def _greedy_from_idx(self, index):
+        """
+        Epsilon-greedy policy for the state whose stand action is at `index` of the flattened Q-table.
+        """
+        uniform, random_action = self._next_rand()
+        if uniform < self.epsilon:
             # Random action
-            return random.choice(self.env.actions)
+            return random_action
         else:
-            return np.argmax(self.Q[dealer_index, player_index, true_count_index, usable_ace_index, :])
+            # Greedy action
+            return int(self._best_a[index // 2])
     
 
+    def _next_rand(self):
+        """
+        Return the next uniform number in [0, 1) and random action, refilling the batch when exhausted.
+        """
+        if self._rand_i == len(self._rand_uniform):
+            self._rand_uniform = self._rng.random(RANDOM_BATCH).tolist()
+            self._rand_action = self._rng.choice(self._actions, RANDOM_BATCH).tolist()
+            self._rand_i = 0
+        i = self._rand_i
+        self._rand_i = i + 1
+        return self._rand_uniform[i], self._rand_action[i]
+
+
     def decay(self, episode, max_episodes):
         """
         Linear decay for learning rate and epsilon.
@@ -72,83 +206,154 @@ class TemporalDifference:
         self.epsilon = max(0, self.max_epsilon * (1 - episode / max_episodes))
 
 
-    def train(self, num_episodes, on_policy=True, true_count=0):
+    def train(self, num_episodes, on_policy=True, true_count=0, verbose=True):
         """
         Train the agent using Temporal Difference learning with eligibility traces.
+        Shows a progress bar, refreshed at most every half second, unless `verbose` is False.
         """
         # Reset environment by default
         self.env.reset()
+
+        # Train on a writable copy of a read-only Q-table, e.g. one memory-mapped by load_q_table
+        if not self._Q.flags.writeable:
+            self.Q = self._Q.copy()
+
+        # Eligibility trace of a visit by its age in steps, (gamma * lambda) ** age, cut off below the threshold
+        trace_powers = (self.gamma * self.lambd) ** np.arange(TRACE_CAPACITY, dtype=np.float32)
+        trace_powers = trace_powers[:max(1, np.count_nonzero(trace_powers >= TRACE_THRESHOLD))]
             
-        for episode in tqdm(range(num_episodes)):
+        # Target of the TD update, chosen once for the whole run
+        td_target = self._sarsa_target if on_policy else self._q_learning_target
+
+        episodes = range(num_episodes)
+        if verbose:
+            episodes = tqdm(episodes, miniters=max(1, num_episodes // 1000), mininterval=0.5)
+
+        for episode in episodes:
             # Apply decay to learning rate and epsilon
             self.decay(episode, num_episodes)
 
             # Reset and start a new game
-            self.E.fill(0)
+            self._num_visited = 0
             # If true count is specified, reset env using true count before each game
             if true_count:
                 self.env.reset(true_count=true_count)
             reward, state, winner = self.env.new_game()
 
-            # Skip games that end immediately
+            # Skip games that end immediately, continuing from the current shoe unless a true count is specified
             while winner:
-                self.env.reset(true_count=true_count)
+                if true_count:
+                    self.env.reset(true_count=true_count)
                 reward, state, winner = self.env.new_game()
 
+            # Map state to its index in the flattened Q-table; each state is mapped once per step
+            index = _flat_index(*self.map_state(state))
+
             while not winner:
-                # Map state
-                dealer_index, player_index, true_count_index, usable_ace_index = self.map_state(state)
-                
                 # Select action using epsilon-greedy policy
-                action = self.epsilon_greedy_policy(state)
+                action = self._greedy_from_idx(index)
                 reward, next_state, winner = self.env.step(action)
 
                 # Compute target
                 if winner:
                     target = reward
                 else:
-                    next_action = self.epsilon_greedy_policy(next_state)
-                    next_dealer_index, next_player_index, next_true_count_index, next_usable_ace_index = self.map_state(next_state)
+                    next_index = _flat_index(*self.map_state(next_state))
+                    target = td_target(reward, next_index)
+
+                # Update Q-values and eligibility traces
+                self._num_visited = _td_step(
+                    self._Q_flat, self._best_a, self.visits, self._visited_index, self._num_visited, trace_powers,
+                    index + action, float(target), self.alpha
+                )
 
-                    if on_policy:
-                        target = reward + self.gamma * self.Q[
-                            next_dealer_index, next_player_index, next_true_count_index, next_usable_ace_index, next_action
-                        ]
-                    else:
-                        target = reward + self.gamma * np.max(
-                            self.Q[next_dealer_index, next_player_index, next_true_count_index, next_usable_ace_index, :]
-                        )
+                # Update state for the next iteration
+                if not winner:
+                    index = next_index
 
-                # Compute TD error
-                delta = target - self.Q[dealer_index, player_index, true_count_index, usable_ace_index, action]
 
-                # Update eligibility trace
-                self.E[dealer_index, player_index, true_count_index, usable_ace_index, action] += 1
+    def _sarsa_target(self, reward, next_index):
+        """
+        On-policy TD target: value of the next state's epsilon-greedy action.
+        """
+        next_action = self._greedy_from_idx(next_index)
+        return reward + self.gamma * self._Q_flat[next_index + next_action]
 
-                # Update Q-values and decay traces
-                self.Q += self.alpha * delta * self.E
-                self.E *= self.gamma * self.lambd
 
-                # Update state for the next iteration
-                state = next_state
+    def _q_learning_target(self, reward, next_index):
+        """
+        Off-policy TD target: value of the next state's best action.
+        """
+        return reward + self.gamma * max(self._Q_flat[next_index], self._Q_flat[next_index + 1])
+
+
+    def train_parallel(self, num_episodes, num_workers=None, on_policy=True, true_count=0, env_fn=None):
+        """
+        Train independent agents in worker processes, splitting the episodes between them, and merge
+        their Q-tables with this agent's, weighting each Q-value by its number of visits.
+        Q-values of state-action pairs that neither this agent nor the workers visited are kept.
+        Each worker plays on a new environment seeded from this agent's random generator.
+
+        Args:
+            num_episodes (int): Total number of episodes over all workers.
+            num_workers (int): Number of worker processes (default is the number of CPUs).
+            on_policy (bool): Train on-policy or off-policy, as in train.
+            true_count (int): True count to reset the environment to before each game, as in train.
+            env_fn (callable): Picklable function returning a new environment for a `seed` keyword argument.
+                Defaults to the class of this agent's environment, with the same `exact_dealer` setting if it has one.
+        """
+        if env_fn is None:
+            env_fn = type(self.env)
+            if hasattr(self.env, 'exact_dealer'):
+                env_fn = partial(env_fn, exact_dealer=self.env.exact_dealer)
+        num_workers = num_workers or os.cpu_count()
+        seeds = self._rng.integers(2 ** 31, size=num_workers).tolist()
+        worker_episodes = [num_episodes // num_workers + (i < num_episodes % num_workers) for i in range(num_workers)]
+        hyperparameters = (self.max_alpha, self.gamma, self.max_epsilon, self.lambd)
+
+        # Spawn fresh interpreters rather than forking this process, which may be running Numba's worker threads
+        with ProcessPoolExecutor(max_workers=num_workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            results = list(executor.map(
+                _train_worker, [env_fn] * num_workers, seeds, worker_episodes,
+                [hyperparameters] * num_workers, [on_policy] * num_workers, [true_count] * num_workers
+            ))
+
+        # Visit-weighted average of this agent's and the workers' Q-tables; pairs never visited keep their Q-value
+        results.append((self.Q_flat, self.visits))
+        weighted_q = sum(visits * q_flat.astype(np.float64) for q_flat, visits in results)
+        total_visits = sum(visits for _, visits in results)
+        merged_q = np.where(total_visits > 0, weighted_q / np.maximum(total_visits, 1), self.Q_flat)
+        self.visits = total_visits
+        self.Q = merged_q.astype(self.Q.dtype).reshape(self.Q.shape)
 
 
     def get_best_action(self, state):
         """
         Returns the best action for a given state based on the trained Q-values.
         """
-        dealer_index, player_index, true_count_index, usable_ace_index = self.map_state(state)
-        q_values = self.Q[dealer_index, player_index, true_count_index, usable_ace_index, :]
+        index = _flat_index(*self.map_state(state))
 
         # Check if the state-action pair has been trained
-        if np.all(q_values == 0):
+        if self._Q_flat[index] == 0 and self._Q_flat[index + 1] == 0:
             # Default action is hit if no Q-values are leanrned
             return 1
         else:
-            # Return the action with the highest Q-value
-            return np.argmax(q_values)
+            # Return the action with the highest Q-value, stand on ties
+            return int(self._best_a[index // 2])
         
 
+    def build_policy_table(self):
+        """
+        Returns the best action of every state as get_best_action would, as an int8 array of shape
+        (10, 17, 13, 2) indexed by dealer first card, player hand value, true count index and usable Aces.
+        Rebuild the table after the Q-values change.
+        """
+        # Action with the highest Q-value, stand on ties, or hit if no Q-values are learned
+        policy_table = self._best_a.reshape(self.Q.shape[:-1]).copy()
+        policy_table[np.all(self.Q == 0, axis=-1)] = 1
+        return policy_table
+
+
     def plot_q_table(self, true_count, usable_aces):
         """
         Plot Q-table heatmaps for the specified true_count and usable_aces (raw values).
@@ -170,20 +375,11 @@ class TemporalDifference:
             # Player hand values 4–20
             player_range = range(4, 21)
 
-        action_0_data = np.zeros((len(player_range), 10))
-        action_1_data = np.zeros((len(player_range), 10))
-
-        # Populate heatmaps
-        for dealer_index in range(10):
-            for i, player_value in enumerate(player_range):
-                # Adjust for Q-table index
-                player_index = player_value - 4
-                action_0_data[i, dealer_index] = self.Q[dealer_index, player_index, true_count_index, usable_ace_index, 0]
-                action_1_data[i, dealer_index] = self.Q[dealer_index, player_index, true_count_index, usable_ace_index, 1]
-
-        # Reverse Q-table
-        action_0_data = np.flipud(action_0_data)
-        action_1_data = np.flipud(action_1_data)
+        # Q-values of the player hands for every dealer card, shape (dealer card, player hand, action),
+        # transposed and reversed so that player hands run down the heatmap rows
+        q_values = self.Q[:, player_range.start - 4:player_range.stop - 4, true_count_index, usable_ace_index, :]
+        action_0_data = np.flipud(q_values[:, :, 0].T)
+        action_1_data = np.flipud(q_values[:, :, 1].T)
 
         # Determine shared color scale
         vmin = math.floor(min(action_0_data.min(), action_1_data.min()))
@@ -222,33 +418,21 @@ class TemporalDifference:
         Args:
             true_count (int): True count value.
         """
-        # Initialize placeholders for policies
-        policy_false = []
-        policy_true = []
-    
-        # For usable_aces = False: player hand total is 4–20
+        true_count_index = self.map_true_count(true_count)
+
+        # Best action of every state in one pass over the Q-table slabs of shape (dealer card, player hand, action),
+        # defaulting to hit where no Q-values are learned as in get_best_action.
+        # For usable_aces = False: player hand total is 4–20; for usable_aces = True: player hand total is 12–20
         player_range_false = range(4, 21)
-        for dealer_index in range(10):
-            column_false = []
-            for player_total in player_range_false:
-                state_false = [dealer_index + 2, player_total, true_count, False]
-                action = self.get_best_action(state_false)
-                column_false.append(action)
-            policy_false.append(column_false)
-
-        # For usable_aces = True: player hand total is 12–20
         player_range_true = range(12, 21)
-        for dealer_index in range(10):  # Dealer card: 2–11
-            column_true = []
-            for player_total in player_range_true:
-                state_true = [dealer_index + 2, player_total, true_count, True]
-                action = self.get_best_action(state_true)
-                column_true.append(action)
-            policy_true.append(column_true)
+        slab_false = self.Q[:, player_range_false.start - 4:player_range_false.stop - 4, true_count_index, 0, :]
+        slab_true = self.Q[:, player_range_true.start - 4:player_range_true.stop - 4, true_count_index, 1, :]
+        policy_false = np.where(np.all(slab_false == 0, axis=-1), 1, np.argmax(slab_false, axis=-1))
+        policy_true = np.where(np.all(slab_true == 0, axis=-1), 1, np.argmax(slab_true, axis=-1))
     
-        # Convert lists to numpy arrays and flip for proper heatmap orientation
-        policy_false = np.flipud(np.array(policy_false).T)
-        policy_true = np.flipud(np.array(policy_true).T)
+        # Flip for proper heatmap orientation
+        policy_false = np.flipud(policy_false.T)
+        policy_true = np.flipud(policy_true.T)
 
         # Create heatmaps with Seaborn
         fig, axes = plt.subplots(1, 2, figsize=(16, 6))
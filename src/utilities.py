@@ -1,11 +1,13 @@
 import os
 import numpy as np
-from tqdm import tqdm
+
+from environment.environment import WINNER_PLAYER, WINNER_DEALER, WINNER_TIE, WINNER_BLACKJACK, WINNER_NAMES
 
 
 def test_td_model(agent, env, num_test_games=10000, true_count=2):
     """
     Test the TemporalDifference agent in the given environment.
+    The agent's policy table is played as a batch of games in compiled code (see `BlackjackGame.simulate`).
 
     Args:
         agent (TemporalDifference): The trained agent to test.
@@ -16,42 +18,15 @@ def test_td_model(agent, env, num_test_games=10000, true_count=2):
     Returns:
         dict: A dictionary containing the test results.
     """
-    wins = 0
-    losses = 0
-    ties = 0
-    blackjack_count = 0
-    total_reward = 0
-
-    for _ in tqdm(range(num_test_games), desc="Testing Games"):
-        env.reset(true_count=true_count)
-        game_reward, state, winner = env.new_game()  # Start a new game
-
-        while not winner:
-            # Get the best action based on the trained model
-            action = agent.get_best_action(state)
-
-            # Take the action in the environment
-            reward, next_state, winner = env.step(action)
-
-            # Accumulate reward for the current game
-            game_reward += reward
-
-            # Update the state
-            state = next_state
-
-        # Track total reward
-        total_reward += game_reward
-
-        # Record the outcome
-        if winner == 'player':
-            wins += 1
-        elif winner == 'blackjack':
-            wins += 1
-            blackjack_count += 1
-        elif winner == 'dealer':
-            losses += 1
-        else:  # Tie
-            ties += 1
+    rewards, winners = env.simulate(num_test_games, agent.build_policy_table(), true_count=true_count)
+
+    # Record the outcomes, counting the games of each winner code
+    counts = np.bincount(winners, minlength=len(WINNER_NAMES))
+    blackjack_count = int(counts[WINNER_BLACKJACK])
+    wins = int(counts[WINNER_PLAYER]) + blackjack_count
+    losses = int(counts[WINNER_DEALER])
+    ties = int(counts[WINNER_TIE])
+    total_reward = float(rewards.sum(dtype=np.float64))
 
     # Compute performance metrics
     win_rate = wins / num_test_games
@@ -73,7 +48,7 @@ def test_td_model(agent, env, num_test_games=10000, true_count=2):
 
 def save_td_model(q_table, file_path):
     """
-    Save the Q-table to a file.
+    Save the Q-table to a file, keeping its dtype.
 
     Args:
         q_table (np.ndarray): The Q-table to save.
@@ -81,68 +56,95 @@ def save_td_model(q_table, file_path):
     """
     # Ensure the directory exists
     os.makedirs(os.path.dirname(file_path), exist_ok=True)
-    # Save the Q-table
-    np.save(file_path, q_table)
+    # Save the Q-table as a plain array file
+    np.save(file_path, q_table, allow_pickle=False)
     print(f"TD model is saved to {file_path}.")
 
 
 def load_q_table(file_path):
     """
     Load the Q-table from a file.
+    The file is memory-mapped, so the OS page cache shares one copy between processes.
 
     Args:
         file_path (str): File path to load the Q-table from.
     
     Returns:
-        np.ndarray: The loaded Q-table.
+        np.memmap: The loaded Q-table, read-only and with the dtype it was saved with.
     """
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"File not found: {file_path}")
-    # Load and return the Q-table
-    q_table = np.load(file_path)
+    # Memory-map and return the Q-table
+    q_table = np.load(file_path, mmap_mode='r', allow_pickle=False)
     print(f"TD model is loaded from {file_path}.")
     return q_table
 
 
-def test_ppo_model(agent, env, num_test_games=10000, true_count=2):
+def test_ppo_model(agent, env, num_test_games=10000, true_count=2, num_envs=64, env_fn=None):
     """
     Test the PPO agent in the given environment.
+    Games are played on `num_envs` copies of the environment in lockstep, so the agent predicts
+    the actions of all running games in one batched call per step.
 
     Args:
         agent (PPO): The trained agent to test.
         env (BlackjackGameGym): The environment to test the agent on.
         num_test_games (int): Number of test games to evaluate.
         true_count (int): True count to reset the environment to.
+        num_envs (int): Number of environments played in parallel.
+        env_fn (callable): Returns a new environment configured like `env`, for the other parallel games.
+            Defaults to the class of `env` if it is not wrapped; a wrapped `env` is played alone.
 
     Returns:
         dict: A dictionary containing the test results.
     """
-    total_rewards = []
-    win_count = 0
-    loss_count = 0
-    tie_count = 0
-
-    for episode in range(num_test_games):
-        env.initialize(true_count=true_count)  # Set initial true count
-        obs, info = env.reset()  # Reset the environment
-
-        done = False
-        episode_reward = 0
-
-        while not done:
-            action, _ = agent.predict(obs, deterministic=True)  # Predict action
-            obs, reward, done, truncated, info = env.step(action)  # Step the environment
-            episode_reward += reward  # Accumulate reward
-
-        total_rewards.append(episode_reward)
-
-        # Track win/loss/tie counts
-        if episode_reward > 0:
-            win_count += 1
-        elif episode_reward < 0:
-            loss_count += 1
-        else:
-            tie_count += 1
+    total_rewards = np.empty(num_test_games)
+    num_finished = 0
+
+    # The given environment plus new environments configured the same way
+    if env_fn is None:
+        if env is not env.unwrapped:
+            num_envs = 1
+        env_fn = type(env)
+    num_envs = min(num_envs, num_test_games)
+    envs = [env] + [env_fn() for _ in range(num_envs - 1)]
+    obs = np.zeros((num_envs,) + env.observation_space.shape, dtype=env.observation_space.dtype)
+    episode_rewards = np.zeros(num_envs)
+
+    def start_episode(i):
+        envs[i].unwrapped.initialize(true_count=true_count)  # Set initial true count, also through wrappers
+        obs[i], info = envs[i].reset()  # Reset the environment
+        episode_rewards[i] = 0
+
+    for i in range(num_envs):
+        start_episode(i)
+    num_started = num_envs
+    running = list(range(num_envs))
+
+    while running:
+        actions, _ = agent.predict(obs[running], deterministic=True)  # Predict actions of all running games
+
+        still_running = []
+        for i, action in zip(running, actions):
+            obs[i], reward, done, truncated, info = envs[i].step(action)  # Step the environment
+            episode_rewards[i] += reward  # Accumulate reward
+
+            if not done:
+                still_running.append(i)
+                continue
+
+            total_rewards[num_finished] = episode_rewards[i]
+            num_finished += 1
+
+            # Start the next game in this environment
+            if num_started < num_test_games:
+                start_episode(i)
+                num_started += 1
+                still_running.append(i)
+        running = still_running
+
+    # Track win/loss/tie counts from the sign of the episode rewards: loss, tie, win
+    loss_count, tie_count, win_count = np.bincount(np.sign(total_rewards).astype(np.int64) + 1, minlength=3).tolist()
 
     # Compute statistics
     average_reward = np.mean(total_rewards)
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from environment.environment import (
+    BlackjackGame, Cards, CARD_VALUES, COUNT_DELTA, DEALER_BLACKJACK, DEALER_OUTCOME_VALUES, WINNER_BLACKJACK,
+    WINNER_NAMES, dealer_draw, dealer_outcome_distribution, get_true_count, play_episode, true_count_shoe
+)
+
+
+@pytest.mark.parametrize("true_count", [-3, 0, 2])
+def test_play_episode_matches_game(true_count):
+    """
+    play_episode must play the same game as BlackjackGame.new_game and step when dealt the same shoe.
+    """
+    rng = np.random.default_rng(0)
+    policy_table = rng.integers(0, 2, size=(10, 17, 13, 2)).astype(np.int8)
+    game = BlackjackGame(seed=0)
+
+    for _ in range(200):
+        game.reset(true_count=true_count)
+        deck = game.cards.deck.copy()
+        top, running_count = game.cards.top, game.cards.running_count
+
+        reward, state, winner = game.new_game()
+        while winner is None:
+            dealer_value, player_value, tc, usable_aces = state
+            action = int(policy_table[dealer_value - 2, player_value - 4, min(max(tc, -6), 6) + 6, int(usable_aces)])
+            reward, state, winner = game.step(action)
+
+        result = play_episode(deck, top, running_count, policy_table, np.empty((0, 13, 7)))
+        assert (result[0], WINNER_NAMES[result[1]], result[2], result[3]) == (
+            reward, winner, game.cards.top, game.cards.running_count
+        )
+
+
+@pytest.mark.parametrize("exact_dealer", [True, False])
+def test_blackjack_rate(exact_dealer):
+    """
+    About 4.5% of games from a fresh shoe are won with a blackjack: a natural 21 the dealer doesn't tie.
+    """
+    game = BlackjackGame(exact_dealer=exact_dealer, seed=1)
+    num_games = 40000
+    num_blackjacks = 0
+
+    for _ in range(num_games):
+        game.reset()
+        reward, state, winner = game.new_game()
+        while winner is None:
+            reward, state, winner = game.step(int(state[1] < 17))
+        num_blackjacks += winner == WINNER_NAMES[WINNER_BLACKJACK]
+
+    assert num_blackjacks / num_games == pytest.approx(0.045, abs=0.005)
+
+
+@pytest.mark.parametrize("true_count", [-20, -2, 1, 5, 11, 52])
+def test_true_count_shoe(true_count):
+    """
+    true_count_shoe deals a permutation of the shoe whose dealt cards give the running count and true count.
+    """
+    np.random.seed(0)
+    for _ in range(50):
+        deck = np.random.permutation(np.tile(CARD_VALUES, 4 * 6))
+        counts = np.bincount(deck)
+        top, running_count = true_count_shoe(deck, true_count)
+
+        assert np.array_equal(np.bincount(deck), counts)
+        assert COUNT_DELTA[deck[top:]].astype(int).sum() == running_count
+        assert get_true_count(running_count, top) == true_count
+
+
+@pytest.mark.parametrize("true_count", [-53, 60])
+def test_true_count_out_of_range(true_count):
+    """
+    A true count that can't be dealt from 6 decks is rejected up front by both the compiled and the Python path.
+    """
+    with pytest.raises(ValueError):
+        true_count_shoe(np.tile(CARD_VALUES, 4 * 6), true_count)
+    with pytest.raises(ValueError):
+        Cards(num_of_decks=6, seed=0).reset(true_count=true_count)
+
+
+def test_dealer_outcome_distribution():
+    """
+    The exact dealer outcome distribution sums to 1 and agrees at true count 0 with the dealer drawing from a shoe.
+    """
+    distribution = dealer_outcome_distribution()
+    np.testing.assert_allclose(np.cumsum(distribution, axis=-1)[..., -1], 1.0)
+
+    rng = np.random.default_rng(0)
+    deck = np.tile(CARD_VALUES, 4 * 6)
+    rng.shuffle(deck)
+    top = deck.size
+    num_games = 40000
+    for dealer_card in range(2, 12):
+        counts = np.zeros(len(DEALER_OUTCOME_VALUES))
+        for _ in range(num_games):
+            # Reshuffle when a quarter of the shoe is left, as the game does
+            if top < deck.size // 4:
+                rng.shuffle(deck)
+                top = deck.size
+            top, _, value, d_len = dealer_draw(deck, top, 0, dealer_card, int(dealer_card == 11), 1)
+            if value > 21:
+                counts[-1] += 1
+            elif value == 21 and d_len == 2:
+                counts[DEALER_BLACKJACK] += 1
+            else:
+                counts[value - 17] += 1
+        np.testing.assert_allclose(counts / num_games, distribution[dealer_card - 2, 6], atol=0.01)
@@ -0,0 +1,115 @@
+import copy
+from functools import partial
+
+import numpy as np
+import pytest
+
+from environment.environment import BlackjackGame
+from model.td_agent import TRACE_CAPACITY, TRACE_THRESHOLD, TemporalDifference, _td_step, _train_worker
+
+
+def test_td_step_matches_dense_traces():
+    """
+    The ring buffer update of _td_step matches TD(lambda) with a dense table of accumulating eligibility traces.
+    """
+    rng = np.random.default_rng(0)
+    alpha, gamma, lambd = 0.1, 0.9, 0.9
+    trace_powers = (gamma * lambd) ** np.arange(TRACE_CAPACITY, dtype=np.float32)
+    trace_powers = trace_powers[:max(1, np.count_nonzero(trace_powers >= TRACE_THRESHOLD))]
+
+    num_pairs = 40
+    q = np.zeros(num_pairs, dtype=np.float32)
+    best_action = np.zeros(num_pairs // 2, dtype=np.int8)
+    visits = np.zeros(num_pairs, dtype=np.int64)
+    visited_index = np.empty(TRACE_CAPACITY, dtype=np.int32)
+    q_reference = np.zeros(num_pairs)
+    visits_reference = np.zeros(num_pairs, dtype=np.int64)
+
+    for _ in range(300):
+        num_visited = 0
+        traces = np.zeros(num_pairs)
+        # Few pairs, so that some are visited several times in an episode
+        for index in rng.integers(num_pairs, size=rng.integers(1, 12)):
+            target = rng.normal()
+
+            num_visited = _td_step(
+                q, best_action, visits, visited_index, num_visited, trace_powers, index, target, alpha
+            )
+
+            delta = target - q_reference[index]
+            visits_reference[index] += 1
+            traces[index] += 1
+            q_reference += alpha * delta * traces
+            traces *= gamma * lambd
+
+    np.testing.assert_allclose(q, q_reference, rtol=1e-4, atol=1e-5)
+    np.testing.assert_array_equal(visits, visits_reference)
+    np.testing.assert_array_equal(best_action, q[1::2] > q[0::2])
+
+
+def test_train_parallel_merge():
+    """
+    A seeded train_parallel run is reproducible, and merges the workers' Q-tables with the agent's own,
+    weighted by their visits.
+    """
+    def trained_agent():
+        agent = TemporalDifference(BlackjackGame(seed=1), seed=1)
+        agent.train(500, verbose=False)
+        return agent
+
+    agent = trained_agent()
+    q_before, visits_before = agent.Q_flat.copy(), agent.visits.copy()
+    seeds = copy.deepcopy(agent._rng).integers(2 ** 31, size=2).tolist()
+    agent.train_parallel(1000, num_workers=2)
+
+    other = trained_agent()
+    other.train_parallel(1000, num_workers=2)
+    np.testing.assert_array_equal(agent.Q, other.Q)
+
+    # Rerun the workers in this process and merge their tables with the agent's
+    hyperparameters = (agent.max_alpha, agent.gamma, agent.max_epsilon, agent.lambd)
+    env_fn = partial(BlackjackGame, exact_dealer=True)
+    results = [_train_worker(env_fn, seed, 500, hyperparameters, True, 0) for seed in seeds]
+    results.append((q_before, visits_before))
+    total_visits = sum(visits for _, visits in results)
+    weighted_q = sum(visits * q_flat.astype(np.float64) for q_flat, visits in results)
+    expected_q = np.where(total_visits > 0, weighted_q / np.maximum(total_visits, 1), q_before)
+
+    np.testing.assert_array_equal(agent.visits, total_visits)
+    np.testing.assert_allclose(agent.Q_flat, expected_q, rtol=1e-6)
+    assert np.all(visits_before <= agent.visits)
+
+
+def expected_policy_table(q_table):
+    """
+    Hit only if its Q-value is strictly higher than stand's, and hit in states with no Q-values learned.
+    """
+    policy_table = (q_table[..., 1] > q_table[..., 0]).astype(np.int8)
+    policy_table[np.all(q_table == 0, axis=-1)] = 1
+    return policy_table
+
+
+def test_policy_table_follows_q():
+    """
+    build_policy_table and get_best_action follow the Q-table after train and after assigning Q,
+    and the Q-table can't be written to in place.
+    """
+    agent = TemporalDifference(BlackjackGame(seed=0), seed=0)
+    agent.train(2000, verbose=False)
+    np.testing.assert_array_equal(agent.build_policy_table(), expected_policy_table(agent.Q))
+
+    q_table = np.random.default_rng(0).normal(size=agent.Q.shape).astype(np.float32)
+    q_table[0, 0, 0, 0] = 0
+    q_table[1, 1, 1, 1] = 1
+    agent.Q = q_table
+    # Changing the assigned array afterwards doesn't change the agent's Q-table
+    q_table[:] = 0
+    policy_table = agent.build_policy_table()
+    np.testing.assert_array_equal(policy_table, expected_policy_table(agent.Q))
+    assert policy_table[0, 0, 0, 0] == 1 and policy_table[1, 1, 1, 1] == 0
+    assert agent.get_best_action((3, 5, -5, True)) == policy_table[1, 1, 1, 1]
+
+    with pytest.raises(ValueError):
+        agent.Q[0, 0, 0, 0, 1] = 1
+    with pytest.raises(ValueError):
+        agent.Q_flat[0] = 1
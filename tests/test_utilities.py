@@ -0,0 +1,62 @@
+import gymnasium as gym
+import numpy as np
+import pytest
+
+from environment.environment_gym import BlackjackGameGym
+# Imported as a module so that pytest doesn't collect the test_* helpers as tests
+from src import utilities
+
+
+class EpisodeCounter(gym.Wrapper):
+    """
+    Count the episodes started and finished on the wrapped environment.
+    """
+    def __init__(self, env):
+        super().__init__(env)
+        self.num_resets = 0
+        self.num_episodes = 0
+
+    def reset(self, **kwargs):
+        self.num_resets += 1
+        return self.env.reset(**kwargs)
+
+    def step(self, action):
+        obs, reward, done, truncated, info = self.env.step(action)
+        self.num_episodes += done
+        return obs, reward, done, truncated, info
+
+
+class FixedAgent:
+    """
+    Stub agent that always stands, recording the size of each batch of observations.
+    """
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict(self, obs, deterministic=True):
+        self.batch_sizes.append(len(obs))
+        return np.zeros(len(obs), dtype=np.int64), None
+
+
+@pytest.mark.parametrize("with_env_fn", [True, False])
+def test_ppo_model_episode_count(with_env_fn):
+    """
+    Exactly num_test_games episodes are played and tallied, over num_envs environments with an env_fn,
+    or on the given wrapped environment alone without one.
+    """
+    envs = [EpisodeCounter(BlackjackGameGym())]
+
+    def env_fn():
+        envs.append(EpisodeCounter(BlackjackGameGym()))
+        return envs[-1]
+
+    agent = FixedAgent()
+    results = utilities.test_ppo_model(
+        agent, envs[0], num_test_games=100, true_count=0, num_envs=8, env_fn=env_fn if with_env_fn else None
+    )
+
+    assert len(envs) == (8 if with_env_fn else 1)
+    assert max(agent.batch_sizes) == len(envs)
+    assert sum(env.num_resets for env in envs) == 100
+    assert sum(env.num_episodes for env in envs) == 100
+    assert results["win_rate"] + results["loss_rate"] + results["tie_rate"] == pytest.approx(1.0)